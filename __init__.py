@@ -1 +1 @@
-from partitioned_convolution import PartitionedConvolutionCPU, PartitionedConvolutionGPU
\ No newline at end of file
+from partitioned_convolution import PartitionedConvolutionCPU, PartitionedConvolutionGPU, PartitionedConvolutionSIMD, PartitionedConvolutionNUPC
\ No newline at end of file
@@ -21,6 +21,7 @@ def prepare_benchmark(block_size: int = 256, input_length: int = FS * 1,
 
     # Create the partitioned auralization object
     pa_cpu = PartitionedAuralization(aur_filter_td, fc_filter_td, block_size, device='cpu')
+    pa_simd = PartitionedAuralization(aur_filter_td, fc_filter_td, block_size, device='simd')
     pa_gpu = PartitionedAuralization(aur_filter_td, fc_filter_td, block_size, device='gpu')
 
     # Define the signal batch
@@ -29,7 +30,7 @@ def prepare_benchmark(block_size: int = 256, input_length: int = FS * 1,
     pad_length = int(np.ceil(input_length / block_size) * block_size - input_length)
     signal_batch = np.pad(signal, (0, pad_length), mode='constant').reshape(-1, block_size)
 
-    return pa_cpu, pa_gpu, signal_batch
+    return pa_cpu, pa_simd, pa_gpu, signal_batch
 
 def benchmark(pa: PartitionedAuralization, signal_batch: np.ndarray, warmup_it: int = 10) -> list:
     # Warm-up
@@ -59,13 +60,15 @@ def start_benchmark(aur_filter_length: int, fc_filter_length: int, num_channels:
  
     input_length = int(NUM_INPUT_FRAMES * block_size)
  
-    pa_cpu, pa_gpu, signal_batch = prepare_benchmark(block_size, input_length, aur_filter_length, fc_filter_length, num_channels)
+    pa_cpu, pa_simd, pa_gpu, signal_batch = prepare_benchmark(block_size, input_length, aur_filter_length, fc_filter_length, num_channels)
 
     time.sleep(0.5)
     _cpu_log = benchmark(pa_cpu, signal_batch)
     time.sleep(0.5)
+    _simd_log = benchmark(pa_simd, signal_batch)
+    time.sleep(0.5)
     _gpu_log = benchmark(pa_gpu, signal_batch)
-    return _cpu_log, _gpu_log
+    return _cpu_log, _simd_log, _gpu_log
 
 # Configure logging
 logging.basicConfig(filename='benchmark_part_aur.log', level=logging.INFO, 
@@ -78,14 +81,16 @@ logging.info('Starting benchmark...')
 #  =================================================================
 aur_filter_lengths = (FS * np.array([0.1, 0.5, 1, 2, 5, 10, 20])).astype(int)
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for aur_filter_length in aur_filter_lengths:
-    cpu_log, gpu_log = start_benchmark(aur_filter_length, DEFAULT_FC_FILTER_LENGTH, DEFAULT_NUM_CHANNELS, DEFAULT_BLOCK_SIZE)
+    cpu_log, simd_log, gpu_log = start_benchmark(aur_filter_length, DEFAULT_FC_FILTER_LENGTH, DEFAULT_NUM_CHANNELS, DEFAULT_BLOCK_SIZE)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_aur_filter_len_aur.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_aur_filter_len_aur.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
          aur_filter_lengths=aur_filter_lengths)
 #  =================================================================
 
@@ -93,28 +98,32 @@ np.savez('./benchmarks/data/benchmark_aur_filter_len_aur.npz', cpu_logs=cpu_logs
 #  =================================================================
 fc_filter_lengths = (FS * np.array([0.1, 0.2, 0.3, 0.5, 0.8, 1., 2., 5.])).astype(int)
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for fc_filter_length in fc_filter_lengths:
-    cpu_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, fc_filter_length, DEFAULT_NUM_CHANNELS, DEFAULT_BLOCK_SIZE)
+    cpu_log, simd_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, fc_filter_length, DEFAULT_NUM_CHANNELS, DEFAULT_BLOCK_SIZE)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_aur_filter_len_fc.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_aur_filter_len_fc.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
           fc_filter_lengths=fc_filter_lengths)
 
 #  Benchmark partitioned auralization for different number of channels
 #  =================================================================
 num_channels = 2 ** np.arange(8)  # 1 to 128 channels
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for num_channel in num_channels:
-    cpu_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, DEFAULT_FC_FILTER_LENGTH, num_channel, DEFAULT_BLOCK_SIZE)
+    cpu_log, simd_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, DEFAULT_FC_FILTER_LENGTH, num_channel, DEFAULT_BLOCK_SIZE)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_aur_num_channels.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_aur_num_channels.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
          num_channels=num_channels)
 #  =================================================================
 
@@ -122,13 +131,15 @@ np.savez('./benchmarks/data/benchmark_aur_num_channels.npz', cpu_logs=cpu_logs,
 #  =================================================================
 block_sizes = [16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for block_size in block_sizes:
-    cpu_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, DEFAULT_FC_FILTER_LENGTH, DEFAULT_NUM_CHANNELS, block_size)
+    cpu_log, simd_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, DEFAULT_FC_FILTER_LENGTH, DEFAULT_NUM_CHANNELS, block_size)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_aur_block_size.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_aur_block_size.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
          block_sizes=block_sizes)
 #  =================================================================
@@ -20,6 +20,7 @@ def prepare_benchmark(block_size: int = 256, input_length: int = FS * 1,
 
     # Create the partitioned convolution object
     pc = fpc.PartitionedConvolutionCPU(filter_td, block_size)
+    pc_simd = fpc.PartitionedConvolutionSIMD(filter_td, block_size)
     pc_gpu = fpc.PartitionedConvolutionGPU(filter_td, block_size)
 
     # Define the signal batch
@@ -28,7 +29,7 @@ def prepare_benchmark(block_size: int = 256, input_length: int = FS * 1,
     pad_length = int(np.ceil(input_length / block_size) * block_size - input_length)  
     signal_batch = np.pad(signal, (0, pad_length), mode='constant').reshape(-1, block_size)
 
-    return pc, pc_gpu, signal_batch
+    return pc, pc_simd, pc_gpu, signal_batch
 
 def benchmark(pc: fpc.PartitionedConvolution, signal_batch: np.ndarray, warmup_it: int = 10) -> list:
     # Warm-up
@@ -38,7 +39,8 @@ def benchmark(pc: fpc.PartitionedConvolution, signal_batch: np.ndarray, warmup_i
     log = []
     for input_batch in signal_batch:
         start_time = time.perf_counter()
-        _ = pc.convolve(input_batch)
+        # Include the transfer of the output to the CPU (the GPU implementation returns a GPU tensor)
+        _ = pc.convolve(input_batch).cpu()
         end_time = time.perf_counter()
         log.append(end_time - start_time)
     return log
@@ -53,12 +55,14 @@ def start_benchmark(filter_length: int, num_channels: int, block_size: int) -> t
     """
     logging.info('Benchmark started for Filter Length: %d, Number of Channels: %d, Block Size: %d', filter_length, num_channels, block_size)
     input_length = int(NUM_INPUT_FRAMES * block_size)
-    pc, pc_gpu, signal_batch = prepare_benchmark(block_size, input_length, filter_length, num_channels)
+    pc, pc_simd, pc_gpu, signal_batch = prepare_benchmark(block_size, input_length, filter_length, num_channels)
     time.sleep(0.5)
     _cpu_log = benchmark(pc, signal_batch)
     time.sleep(0.5)
+    _simd_log = benchmark(pc_simd, signal_batch)
+    time.sleep(0.5)
     _gpu_log = benchmark(pc_gpu, signal_batch)
-    return _cpu_log, _gpu_log
+    return _cpu_log, _simd_log, _gpu_log
 
 
 # Configure logging
@@ -70,14 +74,16 @@ logging.info('Starting benchmark...')
 #  =================================================================
 filter_lengths = (FS * np.array([0.1, 0.5, 1, 2, 5, 10, 20])).astype(int)
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for filter_length in filter_lengths:
-    cpu_log, gpu_log = start_benchmark(filter_length, DEFAULT_NUM_CHANNELS, DEFAULT_BLOCK_SIZE)
+    cpu_log, simd_log, gpu_log = start_benchmark(filter_length, DEFAULT_NUM_CHANNELS, DEFAULT_BLOCK_SIZE)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_conv_filter_len.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_conv_filter_len.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
          filter_lengths=filter_lengths)
 #  =================================================================
 
@@ -85,14 +91,16 @@ np.savez('./benchmarks/data/benchmark_conv_filter_len.npz', cpu_logs=cpu_logs, g
 #  =================================================================
 num_channels = 2 ** np.arange(8)  # 1 to 128 channels
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for num_channel in num_channels:
-    cpu_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, num_channel, DEFAULT_BLOCK_SIZE)
+    cpu_log, simd_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, num_channel, DEFAULT_BLOCK_SIZE)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_conv_num_channels.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_conv_num_channels.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
          num_channels=num_channels)
 #  =================================================================
 
@@ -100,13 +108,15 @@ np.savez('./benchmarks/data/benchmark_conv_num_channels.npz', cpu_logs=cpu_logs,
 #  =================================================================
 block_sizes = [16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
 cpu_logs = []
+simd_logs = []
 gpu_logs = []
 for block_size in block_sizes:
-    cpu_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, DEFAULT_NUM_CHANNELS, block_size)
+    cpu_log, simd_log, gpu_log = start_benchmark(DEFAULT_AUR_FILTER_LENGTH, DEFAULT_NUM_CHANNELS, block_size)
     cpu_logs.append(cpu_log)
+    simd_logs.append(simd_log)
     gpu_logs.append(gpu_log)
 
 # Save the results to a file
-np.savez('./benchmarks/data/benchmark_conv_block_size.npz', cpu_logs=cpu_logs, gpu_logs=gpu_logs,
+np.savez('./benchmarks/data/benchmark_conv_block_size.npz', cpu_logs=cpu_logs, simd_logs=simd_logs, gpu_logs=gpu_logs,
          block_sizes=block_sizes)
 #  =================================================================
@@ -43,6 +43,14 @@ def plot_benchmark_results(benchmark_data_conv, benchmark_data_aur, x_values, x_
     ax.fill_between(x_values, np.min(cpu_logs_conv, axis=1), np.max(cpu_logs_conv, axis=1), alpha=0.2)
     ax.plot(x_values, np.mean(cpu_logs_aur, axis=1), label=legend_labels[1], linestyle='dotted')
     ax.fill_between(x_values, np.min(cpu_logs_aur, axis=1), np.max(cpu_logs_aur, axis=1), alpha=0.2)
+    # Plot the benchmark results (SIMD), if these were benchmarked
+    if 'simd_logs' in benchmark_data_conv and 'simd_logs' in benchmark_data_aur:
+        simd_logs_conv = benchmark_data_conv['simd_logs']
+        simd_logs_aur = benchmark_data_aur['simd_logs']
+        ax.plot(x_values, np.mean(simd_logs_conv, axis=1), label=legend_labels[4], linestyle='solid')
+        ax.fill_between(x_values, np.min(simd_logs_conv, axis=1), np.max(simd_logs_conv, axis=1), alpha=0.2)
+        ax.plot(x_values, np.mean(simd_logs_aur, axis=1), label=legend_labels[5], linestyle='dotted')
+        ax.fill_between(x_values, np.min(simd_logs_aur, axis=1), np.max(simd_logs_aur, axis=1), alpha=0.2)
     # Plot the benchmark results (GPU)
     ax.plot(x_values, np.mean(gpu_logs_conv, axis=1), label=legend_labels[2], linestyle='solid')
     ax.fill_between(x_values, np.min(gpu_logs_conv, axis=1), np.max(gpu_logs_conv, axis=1), alpha=0.2)
@@ -70,7 +78,8 @@ def plot_benchmark_results(benchmark_data_conv, benchmark_data_aur, x_values, x_
 def main():
     """ Main function """
     workspace_dir = os.path.dirname(os.path.abspath(__file__))
-    legend_labels = ['Part. conv. (CPU)', 'Aur. System (CPU)', 'Part. conv. (GPU)', 'Aur. System (GPU)']
+    legend_labels = ['Part. conv. (CPU)', 'Aur. System (CPU)', 'Part. conv. (GPU)', 'Aur. System (GPU)',
+                     'Part. conv. (SIMD)', 'Aur. System (SIMD)']
 
     # Plot benchmark results for different filter lengths
     benchmark_data_conv = np.load(os.path.join(workspace_dir, './data/benchmark_conv_filter_len.npz'), allow_pickle=True)
@@ -132,6 +141,11 @@ def main():
     # Plot the benchmark results (CPU)
     ax.plot(x_values, np.mean(cpu_logs, axis=1), label=legend_labels[1], linestyle='dotted', color="#00B945")
     ax.fill_between(x_values, np.min(cpu_logs, axis=1), np.max(cpu_logs, axis=1), alpha=0.2, color="#00B945")
+    # Plot the benchmark results (SIMD), if these were benchmarked
+    if 'simd_logs' in benchmark_data:
+        simd_logs = benchmark_data['simd_logs']
+        ax.plot(x_values, np.mean(simd_logs, axis=1), label=legend_labels[5], linestyle='dotted', color="#0C5DA5")
+        ax.fill_between(x_values, np.min(simd_logs, axis=1), np.max(simd_logs, axis=1), alpha=0.2, color="#0C5DA5")
     # Plot the benchmark results (GPU)
     ax.plot(x_values, np.mean(gpu_logs, axis=1), label=legend_labels[3], linestyle='dotted', color="#FF2C00")
     ax.fill_between(x_values, np.min(gpu_logs, axis=1), np.max(gpu_logs, axis=1), alpha=0.2, color="#FF2C00")
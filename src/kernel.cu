@@ -2,6 +2,7 @@
 using namespace torch::indexing;
 #include <torch/extension.h>
 #include <c10/cuda/CUDAException.h>
+#include <ATen/cuda/CUDAContext.h>
 
 #define CHECK_CUDA(x) TORCH_CHECK(x.device().is_cuda(), #x " must be a CUDA tensor")
 #define CHECK_CONTIGUOUS(x) TORCH_CHECK(x.is_contiguous(), #x " must be contiguous")
@@ -22,7 +23,100 @@ using namespace torch::indexing;
 
 inline unsigned int cdiv(unsigned int a, unsigned int b) { return (a + b - 1) / b;}
 
-__global__ void conv_kernel(const c10::complex<float>* fdl, const c10::complex<float>* filters_fd, int fdl_cursor, c10::complex<float>* output_fd) {
+#ifdef MULTI_INPUT
+    #define NUM_INPUT_CHANNELS NUM_CHANNELS
+#else
+    #define NUM_INPUT_CHANNELS 1
+#endif
+
+#ifdef BF16_STORAGE
+#include <cuda_bf16.h>
+// The filters and the FDL are stored as separate real and imaginary BF16 planes
+// (shape: (2, C, num_bins, K)), products are accumulated in FP32
+typedef __nv_bfloat16 storage_t;
+#define FILTERS_PLANE (NUM_CHANNELS * NUM_BINS * NUM_PARTS)
+#define FDL_PLANE (NUM_INPUT_CHANNELS * NUM_BINS * NUM_PARTS)
+
+__device__ inline c10::complex<float> load_complex(const storage_t* x, int idx, int plane) {
+    return c10::complex<float>(__bfloat162float(x[idx]), __bfloat162float(x[plane + idx]));
+}
+__device__ inline void store_complex(storage_t* x, int idx, int plane, c10::complex<float> value) {
+    x[idx] = __float2bfloat16(value.real());
+    x[plane + idx] = __float2bfloat16(value.imag());
+}
+#else
+// The filters and the FDL are stored as complex64 (shape: (C, num_bins, K))
+typedef c10::complex<float> storage_t;
+#define FILTERS_PLANE 0
+#define FDL_PLANE 0
+
+__device__ inline c10::complex<float> load_complex(const storage_t* x, int idx, int plane) { return x[idx]; }
+__device__ inline void store_complex(storage_t* x, int idx, int plane, c10::complex<float> value) { x[idx] = value; }
+#endif
+
+__global__ void fdl_update_kernel(const c10::complex<float>* input_fd, storage_t* fdl, const int* fdl_cursor) {
+
+    const int thread_id = blockIdx.x * blockDim.x + threadIdx.x;
+
+    if (thread_id >= NUM_INPUT_CHANNELS * NUM_BINS) return;
+
+    // Store the fd signal in the frequency-domain delay line (shape: (input_C, num_bins, K))
+    store_complex(fdl, thread_id * NUM_PARTS + *fdl_cursor, FDL_PLANE, input_fd[thread_id]);
+}
+
+__global__ void advance_cursor_kernel(int* fdl_cursor) {
+    *fdl_cursor = (*fdl_cursor + 1) % NUM_PARTS;
+}
+
+#define WARP_SIZE 32
+
+#if NUM_PARTS >= WARP_SIZE
+// Warp-cooperative multiply-accumulate: each warp computes a single (channel, bin) output. The lanes of
+// the warp stride over the partitions, such that the loads of the filters and the FDL are coalesced,
+// and the partial sums are reduced with warp shuffles.
+#define OUTPUTS_PER_BLOCK (NUM_THREADS / WARP_SIZE)
+
+__global__ void conv_kernel(const storage_t* fdl, const storage_t* filters_fd, const int* fdl_cursor, c10::complex<float>* output_fd) {
+
+    const int output_id = blockIdx.x * OUTPUTS_PER_BLOCK + threadIdx.x / WARP_SIZE;
+    const int lane_id = threadIdx.x % WARP_SIZE;
+
+    if (output_id >= NUM_CHANNELS * NUM_BINS) return;
+
+    const int channel_id = output_id / NUM_BINS;
+    const int bin_id = output_id % NUM_BINS;
+    const int cursor = *fdl_cursor;
+
+    #ifdef MULTI_INPUT  // Multi-input mode
+    const int fdl_offset = channel_id * (NUM_BINS * NUM_PARTS) + bin_id * NUM_PARTS;
+    const int filter_offset = fdl_offset;
+    #else  // Single-input mode
+    const int fdl_offset = bin_id * NUM_PARTS;
+    const int filter_offset = channel_id * (NUM_BINS * NUM_PARTS) + bin_id * NUM_PARTS;
+    #endif
+
+    c10::complex<float> out = 0;
+    for (int k = lane_id; k < NUM_PARTS; k += WARP_SIZE) {
+        const int slot = (k <= cursor) ? cursor - k : cursor - k + NUM_PARTS;
+        out += load_complex(fdl, fdl_offset + slot, FDL_PLANE) * load_complex(filters_fd, filter_offset + k, FILTERS_PLANE);
+    }
+
+    // Reduce the partial sums of the warp
+    float out_re = out.real();
+    float out_im = out.imag();
+    for (int offset = WARP_SIZE / 2; offset > 0; offset /= 2) {
+        out_re += __shfl_down_sync(0xffffffff, out_re, offset);
+        out_im += __shfl_down_sync(0xffffffff, out_im, offset);
+    }
+    if (lane_id == 0) {
+        output_fd[channel_id * NUM_BINS + bin_id] = c10::complex<float>(out_re, out_im);
+    }
+}
+#else
+// Few partitions: each thread computes a single (channel, bin) output
+#define OUTPUTS_PER_BLOCK NUM_THREADS
+
+__global__ void conv_kernel(const storage_t* fdl, const storage_t* filters_fd, const int* fdl_cursor, c10::complex<float>* output_fd) {
     
     const int thread_id = blockIdx.x * blockDim.x + threadIdx.x;
     
@@ -30,9 +124,9 @@ __global__ void conv_kernel(const c10::complex<float>* fdl, const c10::complex<f
 
     const int channel_id = thread_id / NUM_BINS;
     const int bin_id = thread_id % NUM_BINS;
-    int cursor = fdl_cursor;
+    const int cursor = *fdl_cursor;
 
-    #ifdef MULTI_INPUT  // Multi-input mode  
+    #ifdef MULTI_INPUT  // Multi-input mode
     const int fdl_offset = channel_id * (NUM_BINS * NUM_PARTS) + bin_id * NUM_PARTS;
     const int filter_offset = fdl_offset;
     #else  // Single-input mode
@@ -43,29 +137,44 @@ __global__ void conv_kernel(const c10::complex<float>* fdl, const c10::complex<f
     const int output_offset = channel_id * NUM_BINS + bin_id;
     c10::complex<float> out = 0;
 
-    for (int k = 0; k < NUM_PARTS; ++k) {
-        out += fdl[fdl_offset + cursor] * filters_fd[filter_offset + k];
-        cursor = (cursor - 1 + NUM_PARTS) % NUM_PARTS;
+    // The FDL slot of partition k is (cursor - k) mod K: split the loop at the wrap-around point, such
+    // that the slot is computed without a modulo in the inner loop
+    for (int k = 0; k <= cursor; ++k) {
+        out += load_complex(fdl, fdl_offset + cursor - k, FDL_PLANE) * load_complex(filters_fd, filter_offset + k, FILTERS_PLANE);
+    }
+    for (int k = cursor + 1; k < NUM_PARTS; ++k) {
+        out += load_complex(fdl, fdl_offset + cursor - k + NUM_PARTS, FDL_PLANE) * load_complex(filters_fd, filter_offset + k, FILTERS_PLANE);
     }
     output_fd[output_offset] = out;
 }
+#endif
 
 
-torch::Tensor part_conv_gpu(torch::Tensor input_fd, torch::Tensor fdl, torch::Tensor filters_fd, int fdl_cursor) {
+// All kernels are launched on the current stream and the FDL cursor lives in device memory, such that
+// a call can be captured in a CUDA graph and replayed for every block.
+void part_conv_gpu(torch::Tensor input_fd, torch::Tensor fdl, torch::Tensor filters_fd, torch::Tensor fdl_cursor,
+                   torch::Tensor output_fd) {
     CHECK_INPUT(input_fd);
     CHECK_INPUT(fdl);
     CHECK_INPUT(filters_fd);
+    CHECK_INPUT(fdl_cursor);
+    CHECK_INPUT(output_fd);
 
-    auto output_fd = torch::empty({NUM_CHANNELS, NUM_BINS}, input_fd.options());
-
-    int blocks = cdiv(NUM_CHANNELS * NUM_BINS, NUM_THREADS);
+    const auto stream = at::cuda::getCurrentCUDAStream();
+    int* cursor_ptr = fdl_cursor.data_ptr<int>();
 
     // Store the fd signal in a frequency-domain delay line
-    fdl.index_put_({Slice(), Slice(0, NUM_BINS), fdl_cursor}, input_fd);
+    fdl_update_kernel<<<cdiv(NUM_INPUT_CHANNELS * NUM_BINS, NUM_THREADS), NUM_THREADS, 0, stream>>>(
+        input_fd.data_ptr<c10::complex<float>>(), reinterpret_cast<storage_t*>(fdl.data_ptr()), cursor_ptr);
+    C10_CUDA_KERNEL_LAUNCH_CHECK();
 
     // Perform the convolution
-    conv_kernel<<<blocks, NUM_THREADS>>>(fdl.data_ptr<c10::complex<float>>(), filters_fd.data_ptr<c10::complex<float>>(), fdl_cursor, output_fd.data_ptr<c10::complex<float>>());
+    conv_kernel<<<cdiv(NUM_CHANNELS * NUM_BINS, OUTPUTS_PER_BLOCK), NUM_THREADS, 0, stream>>>(
+        reinterpret_cast<const storage_t*>(fdl.data_ptr()), reinterpret_cast<const storage_t*>(filters_fd.data_ptr()), cursor_ptr,
+        output_fd.data_ptr<c10::complex<float>>());
+    C10_CUDA_KERNEL_LAUNCH_CHECK();
 
+    // Update the fdl_cursor
+    advance_cursor_kernel<<<1, 1, 0, stream>>>(cursor_ptr);
     C10_CUDA_KERNEL_LAUNCH_CHECK(); // Check for errors
-    return output_fd;
 }
\ No newline at end of file
@@ -0,0 +1,121 @@
+// SIMD implementation of the partitioned convolution on the CPU.
+using namespace torch::indexing;
+#include <torch/extension.h>
+#include <ATen/Parallel.h>
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
+
+#define CHECK_CPU(x) TORCH_CHECK(x.device().is_cpu(), #x " must be a CPU tensor")
+#define CHECK_CONTIGUOUS(x) TORCH_CHECK(x.is_contiguous(), #x " must be contiguous")
+#define CHECK_INPUT(x) CHECK_CPU(x); CHECK_CONTIGUOUS(x)
+
+#ifndef NUM_CHANNELS
+    #error "NUM_CHANNELS is not defined"
+#endif
+#ifndef NUM_BINS
+    #error "NUM_BINS is not defined"
+#endif
+#ifndef NUM_PARTS
+    #error "NUM_PARTS is not defined"
+#endif
+
+#ifdef __AVX2__
+// Multiply-accumulate NV vectors of 4 complex bins over all partitions. The complex product is split
+// over two accumulators, acc_re += f_re * x and acc_im += f_im * swap(x), which are combined with a
+// single addsub after the reduction: (f_re * x_re - f_im * x_im, f_re * x_im + f_im * x_re).
+// Gauss's three-multiplication form ((a + ib)(c + id) = (k1 - k2) + i(k1 + k3), with k1 = c(a + b),
+// k2 = b(c + d), k3 = a(d - c)) is not used: it only saves an FMA when (c, d - c, c + d) and (a, b, a + b) are
+// stored as separate planes, which adds 50% more loads to a loop that is bound by loads rather than FMAs
+// (measured 1.5-2x slower for both cache-resident and DRAM-bound problem sizes).
+template <int NV>
+inline void mac_avx2(const float* fdl, const float* filters_fd, int fdl_cursor, float* output_fd) {
+    __m256 acc_re[NV], acc_im[NV];
+    for (int v = 0; v < NV; ++v) {
+        acc_re[v] = _mm256_setzero_ps();
+        acc_im[v] = _mm256_setzero_ps();
+    }
+    for (int k = 0; k < NUM_PARTS; ++k) {
+        const float* f = filters_fd + 2 * k * NUM_BINS;
+        const float* x = fdl + 2 * (fdl_cursor + k) * NUM_BINS;
+        for (int v = 0; v < NV; ++v) {
+            const __m256 a = _mm256_loadu_ps(f + 8 * v);
+            const __m256 b = _mm256_loadu_ps(x + 8 * v);
+            acc_re[v] = _mm256_fmadd_ps(_mm256_moveldup_ps(a), b, acc_re[v]);
+            acc_im[v] = _mm256_fmadd_ps(_mm256_movehdup_ps(a), _mm256_permute_ps(b, 0xB1), acc_im[v]);
+        }
+    }
+    for (int v = 0; v < NV; ++v) {
+        _mm256_storeu_ps(output_fd + 8 * v, _mm256_addsub_ps(acc_re[v], acc_im[v]));
+    }
+}
+#endif
+
+// Scalar multiply-accumulate of the bins [bin_start, bin_end) over all partitions.
+inline void mac_scalar(const c10::complex<float>* fdl, const c10::complex<float>* filters_fd, int fdl_cursor,
+                       c10::complex<float>* output_fd, int bin_start, int bin_end) {
+    for (int bin_id = bin_start; bin_id < bin_end; ++bin_id) {
+        c10::complex<float> out = 0;
+        for (int k = 0; k < NUM_PARTS; ++k) {
+            out += fdl[(fdl_cursor + k) * NUM_BINS + bin_id] * filters_fd[k * NUM_BINS + bin_id];
+        }
+        output_fd[bin_id] = out;
+    }
+}
+
+// Multiply-accumulate the bins [bin_start, bin_end) of a single channel over all partitions.
+void conv_tile(const c10::complex<float>* fdl, const c10::complex<float>* filters_fd, int fdl_cursor,
+               c10::complex<float>* output_fd, int bin_start, int bin_end) {
+    int bin_id = bin_start;
+#ifdef __AVX2__
+    // Process tiles of 16 bins (4 AVX registers per accumulator), followed by single registers of 4 bins
+    for (; bin_id + 16 <= bin_end; bin_id += 16) {
+        mac_avx2<4>(reinterpret_cast<const float*>(fdl + bin_id), reinterpret_cast<const float*>(filters_fd + bin_id),
+                    fdl_cursor, reinterpret_cast<float*>(output_fd + bin_id));
+    }
+    for (; bin_id + 4 <= bin_end; bin_id += 4) {
+        mac_avx2<1>(reinterpret_cast<const float*>(fdl + bin_id), reinterpret_cast<const float*>(filters_fd + bin_id),
+                    fdl_cursor, reinterpret_cast<float*>(output_fd + bin_id));
+    }
+#endif
+    mac_scalar(fdl, filters_fd, fdl_cursor, output_fd, bin_id, bin_end);
+}
+
+// The work is split into tasks of a single channel and a tile of BIN_TILE bins (a multiple of the 16-bin
+// AVX tile), such that a single channel is multi-threaded as well. Tasks are grouped into chunks of at
+// least GRAIN_SIZE multiply-accumulates, such that small problems are not split at all.
+#define BIN_TILE 64
+#define NUM_BIN_TILES ((NUM_BINS + BIN_TILE - 1) / BIN_TILE)
+#define GRAIN_SIZE ((at::internal::GRAIN_SIZE + BIN_TILE * NUM_PARTS - 1) / (BIN_TILE * NUM_PARTS))
+
+torch::Tensor part_conv_cpu(torch::Tensor input_fd, torch::Tensor fdl, torch::Tensor filters_fd, int fdl_cursor) {
+    CHECK_INPUT(input_fd);
+    CHECK_INPUT(fdl);
+    CHECK_INPUT(filters_fd);
+
+    auto output_fd = torch::empty({NUM_CHANNELS, NUM_BINS}, input_fd.options());
+
+    // Store the fd signal in both halves of the frequency-domain delay line (shape: (input_C, 2 * K, num_bins))
+    fdl.index_put_({Slice(), fdl_cursor, Slice()}, input_fd);
+    fdl.index_put_({Slice(), fdl_cursor + NUM_PARTS, Slice()}, input_fd);
+
+    const auto* fdl_ptr = fdl.data_ptr<c10::complex<float>>();
+    const auto* filters_ptr = filters_fd.data_ptr<c10::complex<float>>();
+    auto* output_ptr = output_fd.data_ptr<c10::complex<float>>();
+
+    // Perform the convolution, one (channel, bin tile) pair per task
+    at::parallel_for(0, NUM_CHANNELS * NUM_BIN_TILES, GRAIN_SIZE, [&](int64_t begin, int64_t end) {
+        for (int64_t task_id = begin; task_id < end; ++task_id) {
+            const int channel_id = task_id / NUM_BIN_TILES;
+            const int bin_start = (task_id % NUM_BIN_TILES) * BIN_TILE;
+            #ifdef MULTI_INPUT  // Multi-input mode
+            const auto* fdl_channel = fdl_ptr + channel_id * 2 * NUM_PARTS * NUM_BINS;
+            #else  // Single-input mode
+            const auto* fdl_channel = fdl_ptr;
+            #endif
+            conv_tile(fdl_channel, filters_ptr + channel_id * NUM_PARTS * NUM_BINS, fdl_cursor,
+                      output_ptr + channel_id * NUM_BINS, bin_start, std::min(bin_start + BIN_TILE, NUM_BINS));
+        }
+    });
+    return output_fd;
+}
@@ -8,7 +8,7 @@ feedback cancellator.
 import numpy as np
 import torch
 
-from partitioned_convolution import PartitionedConvolutionCPU, PartitionedConvolutionGPU
+from partitioned_convolution import PartitionedConvolutionCPU, PartitionedConvolutionGPU, PartitionedConvolutionSIMD
 
 
 # Main class
@@ -35,7 +35,7 @@ class PartitionedAuralization:
         :param aur_filter_td: The auralization filter in the time domain (shape: (C, FL_AUR))
         :param fc_filter_td: The feedback cancelation filter in the time domain (shape: (C, FL_FC))
         :param block_length_samples: The block length B
-        :param device: The device to use ('cpu' or 'gpu')
+        :param device: The device to use ('cpu', 'simd' for the compiled AVX2 CPU kernel, or 'gpu')
         """
 
         if aur_filter_td.ndim != 2 or fc_filter_td.ndim != 2:
@@ -58,18 +58,30 @@ class PartitionedAuralization:
                                                     fft_size=fft_size, num_input_channels=1)
             self.pc_fc = PartitionedConvolutionCPU(fc_filter_td, block_length_samples,
                                                    fft_size=fft_size, num_input_channels=self.C)
+        elif self.device == 'simd':
+            self.pc_aur = PartitionedConvolutionSIMD(aur_filter_td, block_length_samples,
+                                                     fft_size=fft_size, num_input_channels=1)
+            self.pc_fc = PartitionedConvolutionSIMD(fc_filter_td, block_length_samples,
+                                                    fft_size=fft_size, num_input_channels=self.C)
         elif self.device == 'gpu':
             self.pc_aur = PartitionedConvolutionGPU(aur_filter_td, block_length_samples,
                                                     fft_size=fft_size, num_input_channels=1)
             self.pc_fc = PartitionedConvolutionGPU(fc_filter_td, block_length_samples,
                                                    fft_size=fft_size, num_input_channels=self.C)
         else:
-            raise ValueError("The device must be either 'cpu' or 'gpu'.")
+            raise ValueError("The device must be either 'cpu', 'simd' or 'gpu'.")
 
         # Initialize the input buffer
         self.input_buffer_td = torch.zeros(1, fft_size, dtype=torch.float32)
-        # Set feedback estimate to zero
-        self.feedback_est_td = torch.zeros(1, self.B, dtype=torch.float32)
+        # Set feedback estimate to zero (kept on the device of the convolutions)
+        self.feedback_est_td = torch.zeros(1, self.B, dtype=torch.float32,
+                                           device='cuda' if self.device == 'gpu' else 'cpu')
+
+        if self.device == 'gpu':
+            # Pinned host buffer and a dedicated stream for the asynchronous device-to-host copy of the output
+            self.output_td_host = torch.zeros((self.C, self.B), dtype=torch.float32, pin_memory=True)
+            self.copy_stream = torch.cuda.Stream()
+            self.copy_event = torch.cuda.Event()
 
     def auralize(self, signal_td: np.ndarray) -> np.ndarray:
         """
@@ -92,8 +104,14 @@ class PartitionedAuralization:
         elif signal_td.dim() == 2 and signal_td.shape != (1, self.B):
             raise ValueError("The input signal must have shape (1, B) or (B,).")
 
-        # subtract the feedback signal from the input signal
-        signal_td = signal_td - self.feedback_est_td
+        if self.device == 'gpu':
+            # Stage the input signal on the GPU, where the feedback estimate is kept, and subtract the
+            # feedback signal in place, such that the block is not copied again
+            signal_td = self.pc_aur.stage_input(signal_td)
+            torch.sub(signal_td, self.feedback_est_td, out=signal_td)
+        else:
+            # subtract the feedback signal from the input signal
+            signal_td = signal_td - self.feedback_est_td
 
         # Transform the input signal to the frequency-domain
         signal_fd = self.pc_aur.__parse_input__(signal_td)
@@ -104,6 +122,13 @@ class PartitionedAuralization:
         # Perform the inverse RFFT to obtain the output signal
         aur_output_td = torch.fft.irfft(aur_output_fd, axis=1)[:, -self.B:] # shape: (C, B)
 
+        if self.device == 'gpu':
+            # Copy the output to the host on a separate stream, overlapping with the feedback cancelation
+            self.copy_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(self.copy_stream):
+                self.output_td_host.copy_(aur_output_td, non_blocking=True)
+                self.copy_event.record()
+
         # Transform the output signal to the frequency-domain for feedback cancelation
         input_fc_td = self.pc_fc.__parse_input__(aur_output_td)
 
@@ -114,10 +139,10 @@ class PartitionedAuralization:
         self.feedback_est_td = torch.fft.irfft(feedback_est_fd, axis=1)[:, -self.B:].sum(axis=0)  # shape: (B,)
 
         if self.device == 'gpu':
-            # Move the output spectrum to the CPU
-            aur_output_td = aur_output_td.cpu()
-            # Move the feedback estimate to the CPU
-            self.feedback_est_td = self.feedback_est_td.cpu()
+            # Wait for the copy of the output, the feedback estimate remains on the GPU. The pinned buffer is
+            # reused by the next call, so the output is copied out of it
+            self.copy_event.synchronize()
+            aur_output_td = self.output_td_host.clone()
 
         # Return the auralization output
         return aur_output_td
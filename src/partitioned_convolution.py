@@ -7,10 +7,14 @@ can be computed by partitioning the signals into blocks and performing the convo
 frequency-domain, which allows for efficient computation of the convolution by exploiting the
 parallel structure of the algorithm.
 """
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
 import os
+import sys
 
-from numba import njit, prange, complex64, int64
+from numba import config, njit, prange, threading_layer, complex64, int64
 import numpy as np
+import scipy.fft
 import torch
 
 # Set the TORCH_CUDA_ARCH_LIST environment variable
@@ -20,46 +24,109 @@ os.environ['TORCH_CUDA_ARCH_LIST'] = '8.6'
 from torch.utils.cpp_extension import load_inline
 
 
+# Extensions loaded in this process, keyed by their name, such that instances with the same
+# problem sizes share a single compiled module
+loaded_modules = {}
+
+
+def extension_name(prefix, sources, funcs, flags):
+    """
+        Derive a deterministic extension name from the sources and the compile flags, such that
+        torch's extension cache reuses a previously built module instead of recompiling it
+    """
+    key = "\n".join(sources + funcs + flags)
+    return f"{prefix}_{hashlib.md5(key.encode()).hexdigest()[:12]}"
+
+
 # Load the CUDA code
 # ================================================================
 def load_cuda(cuda_src, cpp_src, funcs, extra_cuda_cflags=[], verbose=False):
     """
         Load the CUDA code
     """
-    random_id = np.random.randint(0, 1e6)
-    return load_inline(
-        cuda_sources=[cuda_src],
-        cpp_sources=[cpp_src],
-        functions=funcs,
-        extra_cuda_cflags=["-O2"] + extra_cuda_cflags,
-        verbose=verbose,
-        name=f"inline_ext_{random_id}"
-    )
+    extra_cuda_cflags = ["-O2"] + extra_cuda_cflags
+    name = extension_name("inline_ext", [cuda_src, cpp_src], funcs, extra_cuda_cflags)
+    if name not in loaded_modules:
+        loaded_modules[name] = load_inline(
+            cuda_sources=[cuda_src],
+            cpp_sources=[cpp_src],
+            functions=funcs,
+            extra_cuda_cflags=extra_cuda_cflags,
+            verbose=verbose,
+            name=name
+        )
+    return loaded_modules[name]
+
+
+# Load the C++ code
+# ================================================================
+def load_cpp(cpp_src, funcs, extra_cflags=[], verbose=False):
+    """
+        Load the C++ code, with OpenMP enabled, such that at::parallel_for is multi-threaded (without
+        _OPENMP defined, ATen's OpenMP backend runs the whole range on the calling thread)
+    """
+    extra_cflags = ["-O3", "-fopenmp"] + extra_cflags
+    extra_ldflags = ["-fopenmp"]
+    name = extension_name("inline_ext_cpu", [cpp_src], funcs, extra_cflags + extra_ldflags)
+    if name not in loaded_modules:
+        loaded_modules[name] = load_inline(
+            name=name,
+            cpp_sources=[cpp_src],
+            functions=funcs,
+            extra_cflags=extra_cflags,
+            extra_ldflags=extra_ldflags,
+            verbose=verbose
+        )
+    return loaded_modules[name]
 
 # Load CUDA code from file "cuda/kernel.cu"
 cuda_code_path = os.path.join(os.path.dirname(__file__), "kernel.cu")
 cuda_src = open(cuda_code_path, "r", encoding="utf-8").read()
-cpp_src = "torch::Tensor part_conv_gpu(torch::Tensor input_fd, torch::Tensor fdl, torch::Tensor filters_fd, int fdl_cursor);"
+cpp_src = ("void part_conv_gpu(torch::Tensor input_fd, torch::Tensor fdl, torch::Tensor filters_fd, "
+           "torch::Tensor fdl_cursor, torch::Tensor output_fd);")
+
+# Load C++ code from file "kernel_cpu.cpp"
+cpu_code_path = os.path.join(os.path.dirname(__file__), "kernel_cpu.cpp")
+cpu_src = open(cpu_code_path, "r", encoding="utf-8").read()
 
 # ================================================================
 # Multi-threaded CPU implementation of the complex multiplication
 # ================================================================
-@njit(complex64[:, ::1](complex64[:, :, :], complex64[:, :, ::1], int64, complex64[:, :, ::1]), parallel=True)
-def cpu_multiply(filters_fd: np.ndarray, fdl: np.ndarray, fdl_cursor: int, temp_buffer: np.ndarray) -> np.ndarray:
-    _, _, K = filters_fd.shape
-    for k in prange(K):
-        cursor = (K + (fdl_cursor - k)) % K
-        temp_buffer[k, :, :] = filters_fd[:, :, k] * fdl[:, :, cursor]
-    return temp_buffer.sum(axis=0)
-
-
-@njit(complex64[:, ::1](complex64[:, :, :], complex64[:, :, ::1], int64, complex64[:, :, ::1]), parallel=True)
-def cpu_multiply_single_input(filters_fd: np.ndarray, fdl: np.ndarray, fdl_cursor: int, temp_buffer: np.ndarray) -> np.ndarray:
-    K = filters_fd.shape[2]
-    for k in prange(K):
-        cursor = (K + (fdl_cursor - k)) % K
-        temp_buffer[k, :, :] = filters_fd[:, :, k] * fdl[0, :, cursor]
-    return temp_buffer.sum(axis=0)
+@njit(complex64[:, ::1](complex64[:, :, ::1], complex64[:, :, ::1], int64),
+      parallel=True, fastmath=True, boundscheck=False, cache=True, nogil=True)
+def cpu_multiply(filters_fd: np.ndarray, fdl: np.ndarray, fdl_cursor: int) -> np.ndarray:
+    C, num_bins, K = filters_fd.shape
+    output_fd = np.empty((C, num_bins), dtype=np.complex64)
+    # Every (channel, bin) output has its own filter and FDL row, parallelize over all of them, such
+    # that each thread writes an exclusive, contiguous range of outputs, regardless of C and num_bins
+    for i in prange(C * num_bins):
+        c = i // num_bins
+        b = i % num_bins
+        # Accumulate over the partitions, without storing the intermediate products
+        acc = complex64(0)
+        for k in range(K):
+            acc += filters_fd[c, b, k] * fdl[c, b, fdl_cursor + k]
+        output_fd[c, b] = acc
+    return output_fd
+
+
+def cpu_kernels_threadsafe() -> bool:
+    """
+        Whether the parallel Numba kernels may be called by several threads at once, which is not the case
+        for the workqueue threading layer (Numba's fallback if neither TBB nor OpenMP is available)
+    """
+    # The threading layer is only selected once the first parallel kernel is launched
+    cpu_multiply(np.zeros((1, 1, 1), dtype=np.complex64), np.zeros((1, 1, 2), dtype=np.complex64), 0)
+    return threading_layer() != 'workqueue'
+
+
+# Number of threads of the CPU kernels (NUMBA_NUM_THREADS, which defaults to the number of cores)
+CPU_NUM_THREADS = config.NUMBA_NUM_THREADS
+# Minimum number of complex multiply-accumulates per bin tile of the single-input CPU multiply, such that
+# the cost of dispatching a tile to a worker (tens of microseconds) stays small compared to its work
+CPU_MIN_TILE_MACS = 1 << 17
+# Workers that multiply the bin tiles, shared by all instances (threads are only started once used)
+cpu_executor = ThreadPoolExecutor(max_workers=CPU_NUM_THREADS - 1) if CPU_NUM_THREADS > 1 else None
 # ================================================================
 
 # Main class
@@ -116,7 +183,7 @@ class PartitionedConvolution:
         self.num_bins = self.fft_size // 2 + 1
 
         # Create the filter blocks
-        self.filters_fd = self.__create_filter_blocks__(filter_td)  # shape: (K, num_bins, C)
+        self.filters_fd = self.__create_filter_blocks__(filter_td)  # shape: (C, num_bins, K)
         
         # Initialize the frequency-domain delay line (FDL)
         self.fdl = torch.zeros((self.input_C, self.num_bins, self.K), dtype=torch.complex64)
@@ -125,7 +192,11 @@ class PartitionedConvolution:
         # Initialize the input buffers
         self.input_buffer_td = torch.zeros(self.input_C, self.fft_size)
 
-    def __parse_input__(self, signal: np.ndarray) -> None:
+        # Preallocate the (i)RFFT outputs, which are reused for every block
+        self.input_fd = torch.zeros((self.input_C, self.num_bins), dtype=torch.complex64)
+        self.output_td = torch.zeros((self.C, self.fft_size))
+
+    def __validate_input__(self, signal: np.ndarray) -> torch.Tensor:
         # Validate the input signal
         if signal.shape != (self.input_C, self.B):
             if signal.shape == (self.B,) and self.input_C == 1:
@@ -135,41 +206,57 @@ class PartitionedConvolution:
         
         if signal.dtype != torch.float32:
             if signal.dtype == np.float32:
-                signal = torch.tensor(signal)
+                # Shares the memory of the array, which is only copied if it has negative strides (e.g. a
+                # reversed view), as these cannot be represented by a tensor
+                signal = torch.from_numpy(signal if all(s > 0 for s in signal.strides) else signal.copy())
             else:
                 raise ValueError("The input signal must be of type float32.")
+        return signal
+
+    def __parse_input__(self, signal: np.ndarray) -> torch.Tensor:
+        return self.__pack_input__(self.__validate_input__(signal))
 
+    def __pack_input__(self, signal: torch.Tensor) -> torch.Tensor:
         # Input packing:
-        # Shift the input buffer to the left by B samples
-        self.input_buffer_td = torch.roll(self.input_buffer_td, -self.B, dims=1)
+        # Only the last 2 * B samples contribute to the valid output samples, so the previous block is
+        # moved in front of the new one (any samples before that remain zero)
+        self.input_buffer_td[:, -2 * self.B:-self.B] = self.input_buffer_td[:, -self.B:]
         # Fill the rightmost B samples with the new signal
         self.input_buffer_td[:, -self.B:] = signal
 
         # Compute the RFFT of the signals (real-to-complex FFT)
-        input_fd = torch.fft.rfft(self.input_buffer_td, dim=1)  # shape: (input_C, num_bins)
-        return input_fd
+        torch.fft.rfft(self.input_buffer_td, dim=1, out=self.input_fd)  # shape: (input_C, num_bins)
+        return self.input_fd
 
-    def convolve(self, signal_td: np.ndarray) -> np.ndarray:
+    def convolve(self, signal_td: np.ndarray) -> torch.Tensor:
         """
         Perform the uniform partitioned convolution algorithm
         :param signal: The input signal (shape: (C, B))
-        :return: The output signal (shape: (C, B + 1))
+        :return: The output signal (shape: (C, B))
         """
         # Transform the input signal to the frequency-domain
         signal_fd = self.__parse_input__(signal_td)
 
         # Perform the actual convolution
         output_fd = self.__perform_convolution__(signal_fd)
-        
-        if self.device == 'gpu':
-            # Move the output spectrum to the CPU
-            output_fd = output_fd.cpu()
 
         # Perform the inverse RFFT to obtain the output signal
-        output_td = torch.fft.irfft(output_fd, axis=1)  # shape: (C, 2 * B)
+        torch.fft.irfft(output_fd, n=self.fft_size, dim=1, out=self.output_td)  # shape: (C, fft_size)
 
-        # Only return the valid samples
-        return output_td[:, -self.B:]
+        # Only return the valid samples, copied out of the (i)RFFT buffer that is reused by the next call
+        return self.output_td[:, -self.B:].clone()
+
+    def convolve_into(self, signal_td: torch.Tensor, output_td: torch.Tensor) -> None:
+        """
+        Perform the uniform partitioned convolution algorithm without validating the input, and write
+        the output into a buffer provided by the caller. Intended for real-time loops, where the input
+        format is fixed.
+        :param signal_td: The input signal, a float32 tensor (shape: (input_C, B))
+        :param output_td: The output buffer, a float32 tensor (shape: (C, B))
+        """
+        output_fd = self.__perform_convolution__(self.__pack_input__(signal_td))
+        torch.fft.irfft(output_fd, n=self.fft_size, dim=1, out=self.output_td)
+        output_td.copy_(self.output_td[:, -self.B:])
 
     def __create_filter_blocks__(self, filter_td: np.ndarray) -> torch.Tensor:
         # create filter partitions
@@ -181,9 +268,10 @@ class PartitionedConvolution:
         filters_padded = np.pad(
             np.array(filter_parts), ((0, 0), (0, self.fft_size - self.B), (0, 0)), mode='constant')  # shape: (C, fft_size, K)
 
-        # Compute the RFFT of the filters (real-to-complex FFT)
+        # Compute the RFFT of the filters (real-to-complex FFT), using all available CPU cores
         # Note: torch.fft.rfft messes up the ordering (F-contiguous) of the array
-        return torch.from_numpy(np.fft.rfft(filters_padded, axis=1).astype(np.complex64))  # shape: (K, num_bins, C)
+        filters_fd = scipy.fft.rfft(filters_padded, axis=1, workers=-1)  # shape: (C, num_bins, K)
+        return torch.from_numpy(filters_fd.astype(np.complex64, copy=False))
         
 
     def __perform_convolution__(self, input_fd: torch.Tensor | np.ndarray) -> torch.Tensor:
@@ -208,27 +296,57 @@ class PartitionedConvolutionCPU(PartitionedConvolution):
         PartitionedConvolution.__init__(self, filter_td, block_length_samples, fft_size=fft_size,
                                         num_input_channels=num_input_channels)
 
-        self.temp_buffer = np.empty((self.K, self.C, self.num_bins), dtype=np.complex64)
+        # The FDL is stored twice (shape: (input_C, num_bins, 2 * K)), such that the K most recent
+        # input spectra are always found, newest first, at fdl[:, :, fdl_cursor:fdl_cursor + K]
+        self.fdl = np.zeros((self.input_C, self.num_bins, 2 * self.K), dtype=np.complex64)
 
-        # Convert to numpy array
-        self.fdl = self.fdl.numpy()
-        self.filters_fd = self.filters_fd.numpy()
+        if self.input_C == 1:
+            # Single-input mode is a batched complex matrix-vector product per bin, which is dispatched
+            # to BLAS with the filters stored bin-major (C-contiguous, shape: (num_bins, C, K)).
+            # Splitting it into real GEMMs ([F_re; F_im] @ [x_re, x_im], shape: (num_bins, 2C, K) @
+            # (num_bins, K, 2)) is not used: it was measured 1.1-2.4x slower than the complex product,
+            # as it doubles the output and needs an extra pass to recombine the real and imaginary parts
+            self.filters_fd = np.ascontiguousarray(self.filters_fd.numpy().transpose(1, 0, 2))
+
+            # The bins are split into tiles of contiguous bins, each multiplied by a separate BLAS call (which
+            # releases the GIL) into an exclusive part of the output. Within a tile, the FDL window of a bin is
+            # loaded once and reused from cache for all C channels, while the filters are streamed once. There
+            # is at most one tile per thread, and each tile has at least CPU_MIN_TILE_MACS of work, so small
+            # problems are multiplied by the calling thread alone
+            num_tiles = min(CPU_NUM_THREADS, self.num_bins,
+                            max(1, self.num_bins * self.C * self.K // CPU_MIN_TILE_MACS))
+            bounds = np.linspace(0, self.num_bins, num_tiles + 1).astype(int).tolist()
+            self.bin_tiles = [slice(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+            self.output_fd = np.zeros((self.num_bins, self.C, 1), dtype=np.complex64)
+        else:
+            # Convert to numpy array (C-contiguous, shape: (C, num_bins, K))
+            self.filters_fd = np.ascontiguousarray(self.filters_fd.numpy())
 
 
-    def __perform_convolution__(self, input_fd: torch.Tensor | np.ndarray) -> torch.Tensor:
-        if isinstance(input_fd, torch.Tensor):
-            input_fd = input_fd.numpy().astype(np.complex64)
+    def __perform_convolution__(self, input_fd: torch.Tensor) -> torch.Tensor:
+        # The input spectrum is the complex64 RFFT output of __pack_input__, viewed without a copy
+        input_fd = input_fd.numpy()
 
-        # Store the fd signal in a frequency-domain delay line
+        # Store the fd signal in both halves of the frequency-domain delay line
         self.fdl[:, :, self.fdl_cursor] = input_fd
-        
+        self.fdl[:, :, self.fdl_cursor + self.K] = input_fd
+
         # Perform the complex multiplication between the fdl and the filter partitions
         if self.input_C == 1:
-            output_fd = cpu_multiply_single_input(self.filters_fd, self.fdl, self.fdl_cursor, self.temp_buffer)
+            # (num_bins, C, K) @ (num_bins, K, 1) -> (num_bins, C, 1), transposed to (C, num_bins)
+            fdl_window = self.fdl[0, :, self.fdl_cursor:self.fdl_cursor + self.K, None]
+            # The first tile is multiplied by the calling thread, the other tiles by the workers
+            futures = [cpu_executor.submit(np.matmul, self.filters_fd[tile], fdl_window[tile], out=self.output_fd[tile])
+                       for tile in self.bin_tiles[1:]]
+            tile = self.bin_tiles[0]
+            np.matmul(self.filters_fd[tile], fdl_window[tile], out=self.output_fd[tile])
+            for future in futures:
+                future.result()
+            output_fd = self.output_fd[:, :, 0].T
         else:
-            output_fd = cpu_multiply(self.filters_fd, self.fdl, self.fdl_cursor, self.temp_buffer)
-        # Update the fdl_cursor
-        self.fdl_cursor = (self.fdl_cursor + 1) % self.K
+            output_fd = cpu_multiply(self.filters_fd, self.fdl, self.fdl_cursor)
+        # Move the fdl_cursor backwards, such that the oldest spectrum drops out of the window
+        self.fdl_cursor = (self.fdl_cursor - 1) % self.K
         
         return torch.from_numpy(output_fd)
 
@@ -239,35 +357,319 @@ class PartitionedConvolutionGPU(PartitionedConvolution):
     Partitioned Convolution implemented on the GPU
     """
     def __init__(self, filter_td: torch.Tensor, block_length_samples: int, fft_size: int = None,
-                 num_input_channels: int = 1):
+                 num_input_channels: int = 1, use_bf16: bool = False):
         """
         Initialize the partitioned convolution class
         :param filter_td: The filter in the time domain (shape: (C, FL))
         :param block_length_samples: The block length B
         :param fft_size: The desired FFT size (optional), if not provided, it will be set to 2 * B
         :param num_input_channels: The number of input channels (default: 1)
+        :param use_bf16: Store the filters and the FDL in BF16 to halve the memory traffic of the
+                         multiply-accumulate, at the cost of accuracy (default: False)
         """
         PartitionedConvolution.__init__(self, filter_td, block_length_samples, fft_size=fft_size,
                                         num_input_channels=num_input_channels, device='gpu')
+        self.use_bf16 = use_bf16
 
         # Compile CUDA code with specific flags for better performance
         extra_cuda_cflags = [f"-DNUM_CHANNELS={self.C}", f"-DNUM_BINS={self.num_bins}", f"-DNUM_PARTS={self.K}"]
         if self.input_C == self.C:
             extra_cuda_cflags.append("-DMULTI_INPUT")  # Use multi-input mode
+        if self.use_bf16:
+            extra_cuda_cflags.append("-DBF16_STORAGE")  # Store the filters and the FDL in BF16
 
         self.module = load_cuda(cuda_src, cpp_src, ['part_conv_gpu'], extra_cuda_cflags)
 
-        # Load the filters to the GPU
-        self.filters_fd_gpu = self.filters_fd.to('cuda').type(torch.complex64).contiguous()
-        # Load the FDL to the GPU
-        self.fdl_gpu = self.fdl.to('cuda').type(torch.complex64).contiguous()
+        if self.use_bf16:
+            # Load the filters to the GPU as separate real and imaginary planes (shape: (2, C, num_bins, K))
+            self.filters_fd_gpu = torch.stack([self.filters_fd.real, self.filters_fd.imag]).to(
+                'cuda', torch.bfloat16).contiguous()
+            self.fdl_gpu = torch.zeros((2, self.input_C, self.num_bins, self.K), dtype=torch.bfloat16, device='cuda')
+        else:
+            # Load the filters to the GPU
+            self.filters_fd_gpu = self.filters_fd.to('cuda').type(torch.complex64).contiguous()
+            # Load the FDL to the GPU
+            self.fdl_gpu = self.fdl.to('cuda').type(torch.complex64).contiguous()
+        # The FDL cursor is kept on the GPU as well
+        self.fdl_cursor_gpu = torch.zeros(1, dtype=torch.int32, device='cuda')
+
+        # Persistent device buffers, used by the captured CUDA graph
+        self.input_block_gpu = torch.zeros((self.input_C, self.B), device='cuda')
+        self.input_buffer_td_gpu = torch.zeros((self.input_C, self.fft_size), device='cuda')
+        self.input_fd_gpu = torch.zeros((self.input_C, self.num_bins), dtype=torch.complex64, device='cuda')
+        self.output_fd_gpu = torch.zeros((self.C, self.num_bins), dtype=torch.complex64, device='cuda')
+        self.output_td_gpu = torch.zeros((self.C, self.fft_size), device='cuda')
+
+        # Pinned host staging buffers for the asynchronous host-to-device copies, and an event that marks
+        # the completion of the last copy from them
+        self.input_block_host = torch.zeros((self.input_C, self.B), pin_memory=True)
+        self.input_fd_host = torch.zeros((self.input_C, self.num_bins), dtype=torch.complex64, pin_memory=True)
+        self.copy_event = torch.cuda.Event()
+        self.copy_event.record()
+
+        # Warm-up on a side stream (with zero input, which leaves the FDL untouched) and capture the
+        # processing of a single block in a CUDA graph
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            for _ in range(3):
+                self.__process_block__()
+        torch.cuda.current_stream().wait_stream(stream)
+
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.__process_block__()
+        self.fdl_cursor_gpu.zero_()
+
+    def __transform_input__(self) -> None:
+        # Input packing: move the previous block in front of the new one (see PartitionedConvolution)
+        self.input_buffer_td_gpu[:, -2 * self.B:-self.B] = self.input_buffer_td_gpu[:, -self.B:]
+        self.input_buffer_td_gpu[:, -self.B:] = self.input_block_gpu
+        # Compute the RFFT of the signals on the GPU
+        torch.fft.rfft(self.input_buffer_td_gpu, dim=1, out=self.input_fd_gpu)
+
+    def __process_block__(self) -> None:
+        # Compute the RFFT, the partitioned convolution and the inverse RFFT on the GPU
+        self.__transform_input__()
+        self.module.part_conv_gpu(self.input_fd_gpu, self.fdl_gpu, self.filters_fd_gpu, self.fdl_cursor_gpu,
+                                  self.output_fd_gpu)
+        torch.fft.irfft(self.output_fd_gpu, n=self.fft_size, dim=1, out=self.output_td_gpu)
+
+    def __copy_to_gpu__(self, data: torch.Tensor, host_buffer: torch.Tensor, gpu_buffer: torch.Tensor) -> None:
+        if data.is_cuda:
+            gpu_buffer.copy_(data)
+            return
+
+        # Wait for the previous copy from the staging buffer, before overwriting it. The copy is queued on
+        # the current stream, behind the previous block that still reads the device buffer, so the host only
+        # waits for the block before that and runs at most one block ahead of the GPU
+        self.copy_event.synchronize()
+        host_buffer.copy_(data)
+        gpu_buffer.copy_(host_buffer, non_blocking=True)
+        self.copy_event.record()
+
+    def stage_input(self, signal_td: torch.Tensor) -> torch.Tensor:
+        """
+        Copy an input block to the persistent device input buffer, through the pinned staging buffer. The
+        staged block may be modified in place before it is passed to __parse_input__, which does not copy
+        it again.
+        :param signal_td: The input signal, a float32 tensor (shape: (input_C, B))
+        :return: The device input buffer (shape: (input_C, B))
+        """
+        self.__copy_to_gpu__(signal_td, self.input_block_host, self.input_block_gpu)
+        return self.input_block_gpu
+
+    def __pack_input__(self, signal: torch.Tensor) -> torch.Tensor:
+        if signal is not self.input_block_gpu:
+            self.stage_input(signal)
+        self.__transform_input__()
+        return self.input_fd_gpu  # shape: (input_C, num_bins), on the GPU
+
+    def convolve(self, signal_td: np.ndarray) -> torch.Tensor:
+        """
+        Perform the uniform partitioned convolution algorithm on the GPU by replaying the captured
+        CUDA graph. The output is returned on the GPU.
+        :param signal: The input signal (shape: (C, B))
+        :return: The output signal on the GPU (shape: (C, B))
+        """
+        self.stage_input(self.__validate_input__(signal_td))
+        self.graph.replay()
+
+        # Only return the valid samples, copied out of the buffer that is overwritten by the next replay
+        return self.output_td_gpu[:, -self.B:].clone()
+
+    def convolve_into(self, signal_td: torch.Tensor, output_td: torch.Tensor) -> None:
+        """
+        Perform the uniform partitioned convolution algorithm on the GPU without validating the input,
+        and write the output into a buffer provided by the caller (on the CPU or the GPU).
+        :param signal_td: The input signal, a float32 tensor (shape: (input_C, B))
+        :param output_td: The output buffer, a float32 tensor (shape: (C, B))
+        """
+        self.stage_input(signal_td)
+        self.graph.replay()
+        output_td.copy_(self.output_td_gpu[:, -self.B:])
 
     def __perform_convolution__(self, input_fd: torch.Tensor) -> torch.Tensor:
-        # Move the input spectrum to the GPU if not already there
-        input_fd_gpu = input_fd.to('cuda').type(torch.complex64).contiguous()
+        # Move the input spectrum to the GPU if not already there (__parse_input__ computes it in place)
+        if input_fd is not self.input_fd_gpu:
+            self.__copy_to_gpu__(input_fd, self.input_fd_host, self.input_fd_gpu)
         # Perform the convolution on the GPU
-        output_fd = self.module.part_conv_gpu(input_fd_gpu, self.fdl_gpu, self.filters_fd_gpu, self.fdl_cursor)
-        # Update the fdl_cursor
-        self.fdl_cursor = (self.fdl_cursor + 1) % self.K
-        
+        self.module.part_conv_gpu(self.input_fd_gpu, self.fdl_gpu, self.filters_fd_gpu, self.fdl_cursor_gpu,
+                                  self.output_fd_gpu)
+
+        return self.output_fd_gpu
+
+
+# SIMD CPU implementation
+class PartitionedConvolutionSIMD(PartitionedConvolution):
+    """
+    Partitioned Convolution implemented on the CPU, using a compiled AVX2 kernel
+    """
+    def __init__(self, filter_td: torch.Tensor, block_length_samples: int, fft_size: int = None,
+                 num_input_channels: int = 1):
+        """
+        Initialize the partitioned convolution class
+        :param filter_td: The filter in the time domain (shape: (C, FL))
+        :param block_length_samples: The block length B
+        :param fft_size: The desired FFT size (optional), if not provided, it will be set to 2 * B
+        :param num_input_channels: The number of input channels (default: 1)
+        """
+        PartitionedConvolution.__init__(self, filter_td, block_length_samples, fft_size=fft_size,
+                                        num_input_channels=num_input_channels)
+
+        # Compile C++ code with specific flags for better performance
+        extra_cflags = [f"-DNUM_CHANNELS={self.C}", f"-DNUM_BINS={self.num_bins}", f"-DNUM_PARTS={self.K}"]
+        if self.input_C == self.C:
+            extra_cflags.append("-DMULTI_INPUT")  # Use multi-input mode
+        if torch.backends.cpu.get_cpu_capability() in ['AVX2', 'AVX512']:
+            extra_cflags += ["-mavx2", "-mfma"]  # Fall back to scalar code otherwise
+
+        self.module = load_cpp(cpu_src, ['part_conv_cpu'], extra_cflags)
+
+        # Store the filters and FDL with the frequency bins as the contiguous axis
+        self.filters_fd = self.filters_fd.permute(0, 2, 1).contiguous()  # shape: (C, K, num_bins)
+        # Stored twice, such that the window fdl[:, fdl_cursor:fdl_cursor + K] holds the K most recent
+        # input spectra, newest first
+        self.fdl = torch.zeros((self.input_C, 2 * self.K, self.num_bins), dtype=torch.complex64)
+
+    def __perform_convolution__(self, input_fd: torch.Tensor) -> torch.Tensor:
+        # Perform the convolution using the SIMD kernel
+        output_fd = self.module.part_conv_cpu(input_fd.contiguous(), self.fdl, self.filters_fd, self.fdl_cursor)
+        # Move the fdl_cursor backwards, such that the oldest spectrum drops out of the window
+        self.fdl_cursor = (self.fdl_cursor - 1) % self.K
+
         return output_fd
+
+
+# Non-uniform partitioned convolution
+class PartitionedConvolutionNUPC:
+    """
+    Non-uniformly partitioned convolution, composed of uniformly partitioned convolutions
+    """
+    def __init__(self, filter_td: np.ndarray, block_length_samples: int, num_input_channels: int = 1,
+                 partitions_per_segment: int = 8, backend: type = PartitionedConvolutionCPU):
+        """
+        Initialize the non-uniform partitioned convolution class. The filter is split into segments with
+        the block lengths B, 2B, 4B, ..., each consisting of partitions_per_segment partitions, such that the
+        tail of the filter is convolved with long blocks (fewer multiply-accumulates and FFTs per sample),
+        while the latency remains a single block B. Only the first segment is convolved by the calling
+        thread, the longer segments are convolved by worker threads, in the time between the completion of
+        their input block and the first block that needs their output.
+        :param filter_td: The filter in the time domain (shape: (C, FL))
+        :param block_length_samples: The block length B
+        :param num_input_channels: The number of input channels (default: 1)
+        :param partitions_per_segment: The number of partitions of every segment, at least 2 (default: 8)
+        :param backend: The uniform partitioned convolution class that convolves each segment
+                        (default: PartitionedConvolutionCPU)
+        """
+        filter_td = np.asarray(filter_td)
+        if filter_td.ndim != 2:
+            raise ValueError(
+                "The filter must be a 2D array with shape (num_channels, filter_length).")
+
+        self.C, self.FL = filter_td.shape
+        self.input_C = num_input_channels
+        self.B = block_length_samples
+        self.P = partitions_per_segment
+
+        # Validate if FL > B
+        if self.FL < self.B:
+            raise ValueError(
+                "The filter length must be greater than the block length.")
+        # Validate the number of partitions per segment (a single partition leaves no time to convolve a
+        # segment before its output is needed)
+        if self.P < 2:
+            raise ValueError("The number of partitions per segment must be at least 2.")
+
+        # Segment i has the block length N_i = 2^i * B and starts at filter offset o_i = P * B * (2^i - 1).
+        # Its input block completes every N_i / B calls, and its output is needed (P - 1) * (2^i - 1) >=
+        # N_i / B - 1 calls later. The convolution is therefore joined N_i / B - 1 calls after it was
+        # submitted, just before the next input block of the segment completes, and its output is added
+        # o_i - 2 * N_i + 2 * B >= 0 samples after the start of the output block of that call
+        self.segments = []
+        self.segment_block_lengths = []
+        self.segment_delays = []
+        offset = 0
+        block_length = self.B
+        while offset < self.FL:
+            segment_td = filter_td[:, offset:offset + self.P * block_length]
+            if segment_td.shape[1] < block_length:
+                # Zero-pad the tail of the filter to a full block
+                segment_td = np.pad(segment_td, ((0, 0), (0, block_length - segment_td.shape[1])), mode='constant')
+            self.segments.append(backend(segment_td, block_length, num_input_channels=num_input_channels))
+            self.segment_block_lengths.append(block_length)
+            self.segment_delays.append(offset - 2 * block_length + 2 * self.B)
+            offset += self.P * block_length
+            block_length *= 2
+
+        device = 'cuda' if self.segments[0].device == 'gpu' else 'cpu'
+
+        # The input of the longer segments is accumulated in two alternating buffers, such that the next
+        # block is accumulated while the previous one is convolved
+        self.segment_inputs_td = [torch.zeros((2, self.input_C, N)) for N in self.segment_block_lengths[1:]]
+        self.block_count = 0
+
+        # One worker per longer segment; a segment is joined before its next block is submitted, so the
+        # blocks of a single segment are convolved in order. On Linux, the niceness is set per thread, and
+        # the workers are given a lower priority, such that they do not preempt the calling thread. If the
+        # Numba kernel of the multi-input CPU backend cannot run concurrently, the segments are convolved by
+        # the calling thread instead (with the same join schedule, so the output is unchanged, but without
+        # spreading the work)
+        if issubclass(backend, PartitionedConvolutionCPU) and self.input_C > 1 and not cpu_kernels_threadsafe():
+            self.executor = None
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.segments) - 1),
+                                               initializer=os.nice if sys.platform.startswith('linux') else None,
+                                               initargs=(10,))
+        self.pending = [None] * (len(self.segments) - 1)
+
+        # The delayed outputs of the segments are summed in a ring buffer, starting at output_cursor
+        self.output_ring_td = torch.zeros(
+            (self.C, max(d + N for d, N in zip(self.segment_delays, self.segment_block_lengths))), device=device)
+        self.output_cursor = 0
+
+    def convolve(self, signal_td: np.ndarray) -> torch.Tensor:
+        """
+        Perform the non-uniform partitioned convolution algorithm
+        :param signal_td: The input signal (shape: (input_C, B))
+        :return: The output signal (shape: (C, B))
+        """
+        signal_td = self.segments[0].__validate_input__(signal_td)
+
+        for i, (segment, inputs_td, delay) in enumerate(
+                zip(self.segments[1:], self.segment_inputs_td, self.segment_delays[1:])):
+            num_blocks = inputs_td.shape[2] // self.B
+            block_idx = self.block_count % num_blocks
+            input_td = inputs_td[(self.block_count // num_blocks) % 2]
+
+            # Join the convolution of the previous input block, just before the next one completes
+            if (block_idx + 2) % num_blocks == 0 and self.pending[i] is not None:
+                self.__add_to_output__(self.pending[i].result(), delay)
+                self.pending[i] = None
+
+            # Accumulate the input, and submit the convolution once the input block is complete
+            input_td[:, block_idx * self.B:(block_idx + 1) * self.B] = signal_td
+            if block_idx == num_blocks - 1:
+                if self.executor is not None:
+                    self.pending[i] = self.executor.submit(segment.convolve, input_td)
+                else:
+                    self.pending[i] = Future()
+                    self.pending[i].set_result(segment.convolve(input_td))
+        self.block_count += 1
+
+        # The first segment has the block length B, so its output is not delayed
+        output_block = self.output_ring_td[:, self.output_cursor:self.output_cursor + self.B]
+        output_td = self.segments[0].convolve(signal_td)
+        output_td += output_block
+        output_block.zero_()
+        self.output_cursor = (self.output_cursor + self.B) % self.output_ring_td.shape[1]
+
+        return output_td
+
+    def __add_to_output__(self, output_td: torch.Tensor, delay: int) -> None:
+        # Add the output to the ring buffer, wrapping around at its end
+        ring_length = self.output_ring_td.shape[1]
+        start = (self.output_cursor + delay) % ring_length
+        length = min(output_td.shape[1], ring_length - start)
+        self.output_ring_td[:, start:start + length] += output_td[:, :length]
+        self.output_ring_td[:, :output_td.shape[1] - length] += output_td[:, length:]
@@ -29,11 +29,10 @@ def calc_NMSE(x: np.ndarray, y: np.ndarray) -> float:
     """
     return np.linalg.norm(x - y, axis=1) ** 2 / np.mean(np.linalg.norm(y, axis=1) ** 2)
 
-@pytest.fixture(autouse=True)
-def setup_method():
+@pytest.fixture(autouse=True, params=['cpu', 'simd'] + (['gpu'] if torch.cuda.is_available() else []))
+def setup_method(request):
     block_length_samples = 16
-    device = 'gpu' if torch.cuda.is_available() else 'cpu'
-    # device = 'cpu'
+    device = request.param
     dtype = torch.float32
     return block_length_samples, device, dtype
 
@@ -150,4 +149,4 @@ def test_multi_channel_feedback(setup_method):
         output = pa.auralize(input_block)
         output_buffer[:, i * block_length_samples:(i + 1) * block_length_samples] = output.numpy()
 
-    np.testing.assert_array_less(calc_NMSE(output_buffer, expected_output), 1e-3)
\ No newline at end of file
+    np.testing.assert_array_less(calc_NMSE(output_buffer, expected_output), 1e-3)
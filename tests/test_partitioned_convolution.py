@@ -1,9 +1,21 @@
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pytest
-from partitioned_convolution import PartitionedConvolutionCPU, PartitionedConvolutionGPU
+import torch
+from torch.utils.cpp_extension import CUDA_HOME
+import partitioned_convolution
+from partitioned_convolution import PartitionedConvolutionCPU, PartitionedConvolutionGPU, PartitionedConvolutionSIMD, PartitionedConvolutionNUPC
 
 from scipy.signal import convolve
 
+# The GPU tests require a CUDA device (the kernels are built for sm_86)
+requires_gpu = pytest.mark.skipif(not torch.cuda.is_available(), reason="No CUDA device is available.")
+
 
 # Test case 1: Single channel test
 def test_single_channel_cpu():
@@ -33,6 +45,7 @@ def test_single_channel_cpu():
 
 
 # Test case 1: Single channel test GPU
+@requires_gpu
 def test_single_channel_gpu():
     B = 32
     C = 1
@@ -54,7 +67,7 @@ def test_single_channel_gpu():
     true_output = np.pad(true_output, (0, B), mode='constant')
 
     for input_idx, input_batch in enumerate(signal_batch):
-        output = pc.convolve(input_batch)[0, :]
+        output = pc.convolve(input_batch)[0, :].cpu()
         np.testing.assert_allclose(
             output, true_output[input_idx * B:(input_idx + 1) * B], atol=1e-5, rtol=1e-5)
 
@@ -93,6 +106,7 @@ def test_dual_channels_cpu():
 
 
 # Test case 2: Multiple channels test GPU
+@requires_gpu
 def test_dual_channels_gpu():
     B = 32
     C = 2
@@ -119,7 +133,7 @@ def test_dual_channels_gpu():
             signal, filters_td[c, :], mode='full')
 
     for input_idx, input_batch in enumerate(signal_batch):
-        output = pc.convolve(input_batch)
+        output = pc.convolve(input_batch).cpu()
         np.testing.assert_allclose(
             output, true_output[:, input_idx * B:(input_idx + 1) * B],
             atol=1e-5, rtol=1e-5)
@@ -157,6 +171,7 @@ def test_multi_channels_cpu():
 
 
 # Test case 3: Multiple channels test GPU
+@requires_gpu
 def test_multi_channels_gpu():
     B = 256
     C = 100
@@ -184,7 +199,7 @@ def test_multi_channels_gpu():
             signal, filters_td[c, :], mode='full')
 
     for input_idx, input_batch in enumerate(signal_batch):
-        output = pc.convolve(input_batch)
+        output = pc.convolve(input_batch).cpu()
         np.testing.assert_allclose(
             output, true_output[:, input_idx * B:(input_idx + 1) * B],
             atol=5e-4, rtol=5e-4)
@@ -223,6 +238,7 @@ def test_multi_channels_multi_input_cpu():
             atol=5e-4, rtol=5e-4)
 
 
+@requires_gpu
 def test_multi_channels_multi_input_gpu():
     B = 256
     C = 100
@@ -240,6 +256,89 @@ def test_multi_channels_multi_input_gpu():
 
     output_len = signal.shape[1] + FL - 1
 
+    true_output = np.zeros((C, output_len + B))
+    for c in range(C):
+        true_output[c, :output_len] = convolve(
+            signal[c, :], filters_td[c, :], mode='full')
+
+    for input_idx, input_batch in enumerate(signal_batch):
+        output = pc.convolve(input_batch).cpu()
+        np.testing.assert_allclose(
+            output, true_output[:, input_idx * B:(input_idx + 1) * B],
+            atol=5e-4, rtol=5e-4)
+
+
+def test_single_channel_simd():
+    B = 32
+    C = 1
+    FL = 100
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+
+    # Load the partitioned convolution object
+    pc = PartitionedConvolutionSIMD(filters_td, B)
+
+    # Define the signal batch
+    signal = np.random.randn(B * 10).astype(np.float32)
+    signal_batch = np.pad(signal, (0, int(np.ceil(FL / B) * B)),
+                          mode='constant').reshape(-1, B)
+
+    true_output = convolve(signal, filters_td[0, :], mode='full')
+    true_output = np.pad(true_output, (0, B), mode='constant')
+
+    for input_idx, input_batch in enumerate(signal_batch):
+        output = pc.convolve(input_batch)[0, :]
+        np.testing.assert_allclose(
+            output, true_output[input_idx * B:(input_idx + 1) * B], atol=1e-5, rtol=1e-5)
+
+
+def test_multi_channels_simd():
+    B = 256
+    C = 100
+    FL = B * 100
+    I = 10
+    K = np.ceil(FL / B).astype(int)
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionSIMD(filters_td, B)
+
+    # Define the signal batch
+    signal = np.random.randn(B * I).astype(np.float32)
+    signal_batch = np.pad(signal, (0, int(K * B)),
+                          mode='constant').reshape(-1, B)
+
+    output_len = len(signal) + FL - 1
+
+    true_output = np.zeros((C, output_len + B))
+    for c in range(C):
+        true_output[c, :output_len] = convolve(
+            signal, filters_td[c, :], mode='full')
+
+    for input_idx, input_batch in enumerate(signal_batch):
+        output = pc.convolve(input_batch)
+        np.testing.assert_allclose(
+            output, true_output[:, input_idx * B:(input_idx + 1) * B],
+            atol=5e-4, rtol=5e-4)
+
+
+def test_multi_channels_multi_input_simd():
+    B = 256
+    C = 100
+    FL = B * 100
+    I = 10
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionSIMD(filters_td, B, num_input_channels=C)
+
+    # Define the signal batch
+    signal = np.random.randn(C, B * I).astype(np.float32)
+    signal_batch = signal.reshape(C, I, B).swapaxes(0, 1)
+
+    output_len = signal.shape[1] + FL - 1
+
     true_output = np.zeros((C, output_len + B))
     for c in range(C):
         true_output[c, :output_len] = convolve(
@@ -251,3 +350,271 @@ def test_multi_channels_multi_input_gpu():
             output, true_output[:, input_idx * B:(input_idx + 1) * B],
             atol=5e-4, rtol=5e-4)
 
+
+def test_single_channel_multi_threaded_simd():
+    B = 1024
+    C = 1
+    FL = B * 400
+    I = 4
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionSIMD(filters_td, B)
+
+    signal = np.random.randn(B * I).astype(np.float32)
+    true_output = convolve(signal, filters_td[0, :], mode='full')
+
+    # Enough work to split the single channel over the bin tiles (the last tile is partial)
+    num_threads = torch.get_num_threads()
+    torch.set_num_threads(4)
+    try:
+        for input_idx, input_batch in enumerate(signal.reshape(I, B)):
+            output = pc.convolve(input_batch)[0, :]
+            np.testing.assert_allclose(
+                output, true_output[input_idx * B:(input_idx + 1) * B], atol=5e-4, rtol=5e-4)
+    finally:
+        torch.set_num_threads(num_threads)
+
+
+@requires_gpu
+def test_multi_channels_bf16_gpu():
+    B = 256
+    C = 24
+    FL = B * 100
+    I = 10
+    K = np.ceil(FL / B).astype(int)
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionGPU(filters_td, B, use_bf16=True)
+
+    # Define the signal batch
+    signal = np.random.randn(B * I).astype(np.float32)
+    signal_batch = np.pad(signal, (0, int(K * B)),
+                          mode='constant').reshape(-1, B)
+
+    output_len = len(signal) + FL - 1
+
+    true_output = np.zeros((C, output_len + B))
+    for c in range(C):
+        true_output[c, :output_len] = convolve(
+            signal, filters_td[c, :], mode='full')
+
+    output = np.zeros_like(true_output[:, :signal_batch.size])
+    for input_idx, input_batch in enumerate(signal_batch):
+        output[:, input_idx * B:(input_idx + 1) * B] = pc.convolve(input_batch).cpu()
+
+    # BF16 storage is not exact, but should preserve an SNR of at least 40 dB
+    reference = true_output[:, :signal_batch.size]
+    snr = 10 * np.log10(np.sum(reference ** 2) / np.sum((output - reference) ** 2))
+    assert snr > 40
+
+
+def test_convolve_into_cpu():
+    B = 32
+    C = 2
+    FL = 100
+    K = np.ceil(FL / B).astype(int)
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionCPU(filters_td, B)
+
+    # Define the signal batch
+    signal = np.random.randn(B * 10).astype(np.float32)
+    signal_batch = torch.from_numpy(np.pad(signal, (0, int(K * B)),
+                                           mode='constant').reshape(-1, 1, B))
+
+    output_len = len(signal) + FL - 1
+
+    true_output = np.zeros((C, output_len + B))
+    for c in range(C):
+        true_output[c, :output_len] = convolve(
+            signal, filters_td[c, :], mode='full')
+
+    output = torch.empty((C, B))
+    for input_idx, input_batch in enumerate(signal_batch):
+        pc.convolve_into(input_batch, output)
+        np.testing.assert_allclose(
+            output, true_output[:, input_idx * B:(input_idx + 1) * B],
+            atol=1e-5, rtol=1e-5)
+
+
+def test_negative_strides_cpu():
+    B = 32
+    C = 2
+    FL = 100
+    K = np.ceil(FL / B).astype(int)
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionCPU(filters_td, B)
+
+    # Define the signal batch, of which every block is a reversed view with a negative stride
+    signal = np.random.randn(B * 10).astype(np.float32)
+    signal_batch = np.pad(signal, (0, int(K * B)), mode='constant').reshape(-1, B)[:, ::-1]
+
+    output_len = len(signal) + FL - 1
+
+    true_output = np.zeros((C, output_len + B))
+    for c in range(C):
+        true_output[c, :output_len] = convolve(
+            signal.reshape(-1, B)[:, ::-1].flatten(), filters_td[c, :], mode='full')
+
+    for input_idx, input_batch in enumerate(signal_batch):
+        output = pc.convolve(input_batch)
+        np.testing.assert_allclose(
+            output, true_output[:, input_idx * B:(input_idx + 1) * B],
+            atol=1e-5, rtol=1e-5)
+
+
+def test_single_input_bin_tiles_cpu(monkeypatch):
+    # Multiply with 4 threads, regardless of the number of cores
+    monkeypatch.setattr(partitioned_convolution, "CPU_NUM_THREADS", 4)
+    monkeypatch.setattr(partitioned_convolution, "cpu_executor", ThreadPoolExecutor(max_workers=3))
+
+    # Small problems are not split
+    assert len(PartitionedConvolutionCPU(np.random.randn(1, 100).astype(np.float32), 32).bin_tiles) == 1
+
+    B = 256
+    C = 24
+    FL = B * 100
+    I = 10
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionCPU(filters_td, B)
+    assert len(pc.bin_tiles) == 4
+
+    signal = np.random.randn(B * I).astype(np.float32)
+    true_output = np.stack([convolve(signal, filters_td[c, :], mode='full') for c in range(C)])
+
+    for input_idx, input_batch in enumerate(signal.reshape(I, B)):
+        output = pc.convolve(input_batch)
+        np.testing.assert_allclose(
+            output, true_output[:, input_idx * B:(input_idx + 1) * B], atol=5e-4, rtol=5e-4)
+    partitioned_convolution.cpu_executor.shutdown()
+
+
+@pytest.mark.parametrize("convolution", [PartitionedConvolutionCPU, PartitionedConvolutionNUPC])
+def test_collected_outputs_cpu(convolution):
+    B = 32
+    C = 2
+    FL = 1000
+    I = 40
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = convolution(filters_td, B)
+
+    signal = np.random.randn(B * I).astype(np.float32)
+    true_output = np.stack([convolve(signal, filters_td[c, :], mode='full') for c in range(C)])
+
+    # The outputs of previous calls must not be overwritten by the next calls
+    outputs = [pc.convolve(input_batch) for input_batch in signal.reshape(I, B)]
+    np.testing.assert_allclose(torch.cat(outputs, dim=1), true_output[:, :B * I], atol=1e-4, rtol=1e-4)
+
+
+def run_nupc_test(backend, num_input_channels):
+    B = 32
+    C = 2
+    FL = 1000  # Segments of 2 partitions with block lengths 32, 64, 128, 256 and a zero-padded 512
+    K = np.ceil(FL / B).astype(int)
+
+    filters_td = np.random.randn(C * FL).astype(np.float32)
+    filters_td = filters_td.reshape(C, FL, order='C')
+    pc = PartitionedConvolutionNUPC(filters_td, B, num_input_channels=num_input_channels,
+                                    partitions_per_segment=2, backend=backend)
+
+    # Define the signal batch
+    signal = np.random.randn(num_input_channels, B * 40).astype(np.float32)
+    signal_batch = np.pad(signal, ((0, 0), (0, int(K * B))), mode='constant').reshape(num_input_channels, -1, B)
+
+    output_len = signal.shape[1] + FL - 1
+
+    true_output = np.zeros((C, output_len + B))
+    for c in range(C):
+        true_output[c, :output_len] = convolve(
+            signal[c % num_input_channels], filters_td[c, :], mode='full')
+
+    for input_idx in range(signal_batch.shape[1]):
+        output = pc.convolve(signal_batch[:, input_idx]).cpu()
+        np.testing.assert_allclose(
+            output, true_output[:, input_idx * B:(input_idx + 1) * B],
+            atol=1e-4, rtol=1e-4)
+
+
+def test_nupc_cpu():
+    run_nupc_test(PartitionedConvolutionCPU, 1)
+
+
+def test_nupc_multi_input_cpu():
+    run_nupc_test(PartitionedConvolutionCPU, 2)
+
+
+@requires_gpu
+def test_nupc_gpu():
+    run_nupc_test(PartitionedConvolutionGPU, 1)
+
+
+def test_nupc_multi_input_cpu_workqueue():
+    # The workqueue threading layer aborts the interpreter if parallel kernels are launched concurrently,
+    # so the segments must be convolved by the calling thread. The layer is selected per process.
+    code = ("import test_partitioned_convolution as t\n"
+            "from partitioned_convolution import PartitionedConvolutionCPU\n"
+            "t.run_nupc_test(PartitionedConvolutionCPU, 2)\n"
+            "from numba import threading_layer\n"
+            "assert threading_layer() == 'workqueue'\n")
+    env = dict(os.environ, NUMBA_THREADING_LAYER='workqueue',
+               PYTHONPATH=os.pathsep.join([os.path.dirname(__file__)] + sys.path))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_nupc_bounded_work_per_call():
+    B = 32
+    C = 2
+    FL = 4000
+
+    filters_td = np.random.randn(C, FL).astype(np.float32)
+    pc = PartitionedConvolutionNUPC(filters_td, B, partitions_per_segment=2)
+    assert len(pc.segments) > 3
+
+    # Record the thread that convolves each segment
+    caller = threading.get_ident()
+    convolutions = []
+    for segment_idx, segment in enumerate(pc.segments):
+        def convolve(signal_td, segment_idx=segment_idx, convolve=segment.convolve):
+            convolutions.append((segment_idx, threading.get_ident()))
+            return convolve(signal_td)
+        segment.convolve = convolve
+
+    num_blocks = 4 * pc.segment_block_lengths[-1] // B
+    for _ in range(num_blocks):
+        pc.convolve(np.random.randn(B).astype(np.float32))
+    pc.executor.shutdown(wait=True)
+
+    # Every call only convolves the first segment on the calling thread, the longer segments are
+    # convolved by the workers
+    assert [s for s, thread in convolutions if thread == caller] == [0] * num_blocks
+    for segment_idx, block_length in enumerate(pc.segment_block_lengths[1:], start=1):
+        assert sum(s == segment_idx for s, _ in convolutions) == num_blocks * B // block_length
+
+
+def test_nupc_single_partition_per_segment():
+    filters_td = np.random.randn(1, 1000).astype(np.float32)
+    with pytest.raises(ValueError):
+        PartitionedConvolutionNUPC(filters_td, 32, partitions_per_segment=1)
+
+
+# The CUDA kernel is compiled for every code path (per-thread and warp-per-output kernel, single and
+# multi-input mode, complex64 and BF16 storage), which only requires the CUDA toolkit, not a device
+@pytest.mark.skipif(CUDA_HOME is None, reason="The CUDA toolkit is not available.")
+@pytest.mark.parametrize("num_parts", [4, 40])
+@pytest.mark.parametrize("extra_cuda_cflags", [[], ["-DMULTI_INPUT"], ["-DBF16_STORAGE"],
+                                               ["-DMULTI_INPUT", "-DBF16_STORAGE"]])
+def test_compile_cuda_kernel(num_parts, extra_cuda_cflags):
+    module = partitioned_convolution.load_cuda(
+        partitioned_convolution.cuda_src, partitioned_convolution.cpp_src, ['part_conv_gpu'],
+        ["-DNUM_CHANNELS=2", "-DNUM_BINS=65", f"-DNUM_PARTS={num_parts}"] + extra_cuda_cflags)
+    assert hasattr(module, 'part_conv_gpu')